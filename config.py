@@ -3,4 +3,9 @@ LM_STUDIO_MODEL = "local-model"
 ANKI_CONNECT_URL = "http://localhost:8765"
 ANKI_DECK_NAME = "Japanese"
 ANKI_NOTE_TYPE = "Basic"
-AUDIO_DIR = "audio/"
+# Write audio straight into Anki's media folder when Anki runs on this
+# machine. Set to False to always upload it through AnkiConnect.
+ANKI_DIRECT_MEDIA_WRITE = True
+AUDIO_DIR = "audio/"  # output of the synchronous tts.generate_audio
+CACHE_DIR = "cache/"
+AUDIO_CACHE_DIR = "cache/audio/"  # set to None to disable the audio cache
@@ -1,80 +1,169 @@
 import argparse
+import asyncio
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 from modules.retriever import lookup
-from modules.llm import generate_examples
-from modules.tts import generate_audio
+from modules.llm import generate_examples, warm_up
+from modules.tts import generate_audio_async
 from modules.flashcard import build_flashcard
-from modules.anki_connect import add_note
+from modules.anki_connect import add_notes
+
+_SANITIZE_RE = re.compile(r'[^\w\s-]', re.UNICODE)
+
+# Lookups run off the event loop so other requests progress meanwhile. A single
+# worker keeps the jamdict database and lookup cache on one thread.
+_LOOKUP_EXECUTOR = ThreadPoolExecutor(max_workers=1)
 
 
 def sanitize_filename(text: str) -> str:
     """Create a safe filename from Japanese text."""
-    return re.sub(r'[^\w\s-]', '', text, flags=re.UNICODE).strip()[:50]
+    return _SANITIZE_RE.sub('', text).strip()[:50]
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Generate an Anki flashcard for a Japanese word")
-    parser.add_argument("word", help="Japanese word to create a flashcard for")
-    args = parser.parse_args()
-    word = args.word
-
+async def prepare_flashcard(word: str, log=print) -> dict:
+    """Run the lookup, LLM and TTS steps for one word and build its flashcard."""
     # Step 1: Dictionary lookup
-    print(f"[1/5] Looking up '{word}'...")
-    try:
-        vocab_info = lookup(word)
-    except ValueError as e:
-        print(f"Error: {e}")
-        sys.exit(1)
-    print(f"      Readings: {', '.join(vocab_info['readings'])}")
-    print(f"      Meanings: {', '.join(vocab_info['meanings'])}")
-
-    # Step 2: LLM examples
-    print(f"[2/5] Generating example sentence...")
-    try:
-        llm_output = generate_examples(vocab_info)
-    except ConnectionError as e:
-        print(f"Error: {e}")
-        sys.exit(1)
-    print(f"      Example: {llm_output['example_sentence']}")
-    print(f"      Translation: {llm_output['example_sentence_translation']}")
+    log(f"[1/5] Looking up '{word}'...")
+    vocab_info = await asyncio.get_running_loop().run_in_executor(_LOOKUP_EXECUTOR, lookup, word)
+    log(f"      Readings: {', '.join(vocab_info['readings'])}")
+    log(f"      Meanings: {', '.join(vocab_info['meanings'])}")
 
-    # Step 3: TTS audio
-    print(f"[3/5] Generating audio...")
+    # The word audio only needs the word itself, so start it while the LLM runs
     safe_word = sanitize_filename(word)
     word_filename = f"{safe_word}_word.mp3"
     sentence_filename = f"{safe_word}_sentence.mp3"
+    word_tts_task = asyncio.create_task(generate_audio_async(word))
+    sentence_tts_task = None
 
-    word_audio_path = generate_audio(word, word_filename)
-    sentence_audio_path = generate_audio(llm_output["example_sentence"], sentence_filename)
-    print(f"      Audio saved to {word_audio_path} and {sentence_audio_path}")
+    def start_sentence_tts(sentence: str) -> None:
+        # Called mid-stream, so the sentence audio overlaps the rest of the LLM output
+        nonlocal sentence_tts_task
+        sentence_tts_task = asyncio.create_task(generate_audio_async(sentence))
 
+    # Step 2: LLM examples
+    log(f"[2/5] Generating example sentence...")
+    try:
+        llm_output = await generate_examples(vocab_info, start_sentence_tts)
+    except BaseException:
+        word_tts_task.cancel()
+        if sentence_tts_task:
+            sentence_tts_task.cancel()
+        raise
+    log(f"      Example: {llm_output['example_sentence']}")
+    log(f"      Translation: {llm_output['example_sentence_translation']}")
+
+    # Step 3: TTS audio
+    log(f"[3/5] Generating audio...")
+    if sentence_tts_task is None:
+        sentence_tts_task = asyncio.create_task(generate_audio_async(llm_output["example_sentence"]))
+    try:
+        word_audio, sentence_audio = await asyncio.gather(word_tts_task, sentence_tts_task)
+    except BaseException:
+        word_tts_task.cancel()
+        sentence_tts_task.cancel()
+        raise
+    log(f"      Audio generated for {word_filename} and {sentence_filename}")
+
+    # The audio stays in memory and is written straight to Anki from there
     audio_paths = {
-        "word_path": word_audio_path,
+        "word_data": word_audio,
         "word_filename": word_filename,
-        "sentence_path": sentence_audio_path,
+        "sentence_data": sentence_audio,
         "sentence_filename": sentence_filename,
     }
 
     # Step 4: Build flashcard
-    print(f"[4/5] Building flashcard...")
+    log(f"[4/5] Building flashcard...")
     flashcard = build_flashcard(vocab_info, llm_output, audio_paths)
-    print(f"      Front: {flashcard['front']}")
+    log(f"      Front: {flashcard['front']}")
+    return flashcard
+
+
+async def run_all(words: list, concurrency: int) -> int:
+    """Create flashcards for several words concurrently; return the failure count."""
+    sem = asyncio.Semaphore(concurrency)
+
+    # Let LM Studio load the model while the first lookups run. Only batches
+    # do this: for a single word it would just add a round trip in front of
+    # the real request.
+    warmup_task = asyncio.create_task(warm_up())
+
+    async def run_one(word: str) -> dict:
+        async with sem:
+            try:
+                return await prepare_flashcard(word, lambda msg: print(f"[{word}] {msg}"))
+            except (ValueError, ConnectionError, RuntimeError) as e:
+                print(f"[{word}] Error: {e}")
+                return None
+            except Exception as e:
+                # Anything else (timeouts, malformed LLM output, TTS failures)
+                # fails this word only instead of aborting the whole batch
+                detail = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                print(f"[{word}] Error: {detail}")
+                return None
+
+    flashcards = await asyncio.gather(*(run_one(w) for w in words))
+    await warmup_task
+    prepared = [(w, f) for w, f in zip(words, flashcards) if f is not None]
+    if not prepared:
+        return len(words)
+
+    # Add the notes in batched AnkiConnect requests once all cards are ready
+    print(f"[5/5] Adding {len(prepared)} flashcards to Anki...")
+    results = await add_notes([f for _, f in prepared])
+
+    failed = len(words) - len(prepared)
+    for (word, _), (note_id, error) in zip(prepared, results):
+        if note_id is None:
+            print(f"[{word}] Error: {error}")
+            failed += 1
+        elif error:
+            print(f"[{word}] Flashcard added (Note ID: {note_id}), but {error}")
+        else:
+            print(f"[{word}] Flashcard added successfully! (Note ID: {note_id})")
+    return failed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Generate Anki flashcards for Japanese words")
+    parser.add_argument("word", nargs="?", help="Japanese word to create a flashcard for")
+    parser.add_argument("--words-file", help="File with one Japanese word per line")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Number of words to process at once with --words-file (default: 4)")
+    args = parser.parse_args()
+
+    if args.words_file:
+        with open(args.words_file, encoding="utf-8") as f:
+            words = [line.strip() for line in f if line.strip()]
+        failed = await run_all(words, max(1, args.concurrency))
+        print(f"\nAdded {len(words) - failed}/{len(words)} flashcards.")
+        if failed:
+            sys.exit(1)
+        return
+
+    if not args.word:
+        parser.error("a word or --words-file is required")
 
-    # Step 5: Add to Anki
-    print(f"[5/5] Adding to Anki...")
     try:
-        note_id = add_note(flashcard)
-    except ConnectionError as e:
-        print(f"Error: {e}")
-        sys.exit(1)
-    except RuntimeError as e:
+        flashcard = await prepare_flashcard(args.word)
+
+        # Step 5: Add to Anki
+        print(f"[5/5] Adding to Anki...")
+        [(note_id, error)] = await add_notes([flashcard])
+    except (ValueError, ConnectionError, RuntimeError) as e:
         print(f"Error: {e}")
         sys.exit(1)
 
-    print(f"\nFlashcard added successfully! (Note ID: {note_id})")
+    if note_id is None:
+        print(f"Error: {error}")
+        sys.exit(1)
+    if error:
+        print(f"\nFlashcard added (Note ID: {note_id}), but {error}")
+    else:
+        print(f"\nFlashcard added successfully! (Note ID: {note_id})")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,49 +1,122 @@
+import asyncio
 import base64
-import requests
+import os
+import socket
+from typing import Optional
+import httpx
+import orjson
 import config
 
+# Shared client so calls reuse a kept-alive connection instead of reconnecting
+_CLIENT = httpx.AsyncClient(
+    headers={"Content-Type": "application/json"},
+    timeout=10,
+    transport=httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)],
+    ),
+)
 
-def _invoke(action: str, **params) -> dict:
+# Cards per multi request, so a long word list isn't sent as one huge body
+_MULTI_BATCH_SIZE = 10
+# multi requests carry several cards' audio, so give Anki longer to answer
+_MULTI_TIMEOUT = 60
+
+# Decks already created during this session
+_deck_created = set()
+
+# Anki's media folder if it is writable from here, looked up once per session
+_media_dir = None
+_media_dir_checked = False
+
+
+async def _invoke(action: str, timeout: float = 10, **params) -> dict:
     """Send a request to AnkiConnect."""
     payload = {"action": action, "version": 6, "params": params}
     try:
-        resp = requests.post(config.ANKI_CONNECT_URL, json=payload, timeout=10)
+        resp = await _CLIENT.post(
+            config.ANKI_CONNECT_URL, content=orjson.dumps(payload), timeout=timeout
+        )
         resp.raise_for_status()
-    except requests.ConnectionError:
+    except httpx.ConnectError:
         raise ConnectionError(
             "Cannot connect to AnkiConnect. "
             "Is Anki open with the AnkiConnect add-on installed?"
         )
-    result = resp.json()
+    except httpx.TimeoutException:
+        raise RuntimeError(
+            f"AnkiConnect did not respond to '{action}' in time; "
+            "it may or may not have been applied."
+        )
+    result = orjson.loads(resp.content)
     if result.get("error"):
         raise RuntimeError(f"AnkiConnect error: {result['error']}")
     return result["result"]
 
 
-def ensure_deck_exists(deck_name: str) -> None:
-    """Create the deck if it doesn't already exist."""
-    _invoke("createDeck", deck=deck_name)
+async def _local_media_dir() -> Optional[str]:
+    """Return Anki's media folder if it can be written to directly.
+
+    The path comes from AnkiConnect, so it always belongs to the profile that
+    is open in Anki.
+    """
+    global _media_dir, _media_dir_checked
+    if not config.ANKI_DIRECT_MEDIA_WRITE:
+        return None
+    if not _media_dir_checked:
+        try:
+            path = await _invoke("getMediaDirPath")
+        except RuntimeError:
+            # Older AnkiConnect versions don't have getMediaDirPath
+            path = None
+        _media_dir_checked = True
+        # The folder only exists here when Anki runs on this machine
+        if path and os.path.isdir(path) and os.access(path, os.W_OK):
+            _media_dir = path
+    return _media_dir
+
+
+def _action(action: str, **params) -> dict:
+    """Build an action for AnkiConnect's multi request."""
+    return {"action": action, "version": 6, "params": params}
+
 
+def _write_file(path: str, data: bytes) -> None:
+    """Write bytes to a file."""
+    with open(path, "wb") as f:
+        f.write(data)
 
-def _store_media(filepath: str, filename: str) -> None:
-    """Store an audio file in Anki's media folder via AnkiConnect."""
-    with open(filepath, "rb") as f:
-        data = base64.b64encode(f.read()).decode("utf-8")
-    _invoke("storeMediaFile", filename=filename, data=data)
 
+def _b64(data: bytes) -> str:
+    """Base64-encode audio for a storeMediaFile action."""
+    return base64.b64encode(data).decode("ascii")
 
-def add_note(flashcard: dict) -> int:
-    """Add a note to Anki and store associated audio files."""
-    ensure_deck_exists(config.ANKI_DECK_NAME)
 
-    # Store audio files in Anki's media folder
-    audio_paths = flashcard.get("audio_paths", {})
-    if audio_paths.get("word_path"):
-        _store_media(audio_paths["word_path"], audio_paths["word_filename"])
-    if audio_paths.get("sentence_path"):
-        _store_media(audio_paths["sentence_path"], audio_paths["sentence_filename"])
+async def _store_media_bytes(data: bytes, filename: str, media_dir: Optional[str]) -> Optional[dict]:
+    """Store in-memory audio in Anki's media folder.
 
-    note = {
+    The audio is written directly when media_dir is given. Otherwise, or if
+    that write fails, the storeMediaFile action to send via AnkiConnect is
+    returned.
+    """
+    # File writes and encoding run in a worker thread so they don't stall
+    # other cards' requests
+    loop = asyncio.get_running_loop()
+    if media_dir:
+        dest = os.path.join(media_dir, filename)
+        try:
+            await loop.run_in_executor(None, _write_file, dest, data)
+            return None
+        except OSError:
+            # Let AnkiConnect store it instead; its errors are reported per card
+            pass
+    encoded = await loop.run_in_executor(None, _b64, data)
+    return _action("storeMediaFile", filename=filename, data=encoded)
+
+
+def _build_note(flashcard: dict) -> dict:
+    """Build the AnkiConnect note for a flashcard."""
+    return {
         "deckName": config.ANKI_DECK_NAME,
         "modelName": config.ANKI_NOTE_TYPE,
         "fields": {
@@ -55,4 +128,76 @@ def add_note(flashcard: dict) -> int:
         },
     }
 
-    return _invoke("addNote", note=note)
+
+async def _add_note_batch(flashcards: list) -> list:
+    """Add notes and their audio files to Anki in a single multi request."""
+    # Each setup action remembers which card it belongs to (None for the deck)
+    # so its error can be reported against that card
+    actions = []
+    owners = []
+    if config.ANKI_DECK_NAME not in _deck_created:
+        actions.append(_action("createDeck", deck=config.ANKI_DECK_NAME))
+        owners.append(None)
+
+    media_dir = await _local_media_dir()
+    pending = []
+    for i, flashcard in enumerate(flashcards):
+        audio_paths = flashcard.get("audio_paths", {})
+        for kind in ("word", "sentence"):
+            if audio_paths.get(f"{kind}_data"):
+                filename = audio_paths[f"{kind}_filename"]
+                pending.append((i, _store_media_bytes(audio_paths[f"{kind}_data"], filename, media_dir)))
+    stored = await asyncio.gather(*(coro for _, coro in pending))
+    for (i, _), action in zip(pending, stored):
+        if action:
+            actions.append(action)
+            owners.append(i)
+
+    # AnkiConnect runs the actions in order, so the deck and media are in
+    # place before any note that refers to them is added
+    setup_count = len(actions)
+    actions += [_action("addNote", note=_build_note(f)) for f in flashcards]
+    results = await _invoke("multi", timeout=_MULTI_TIMEOUT, actions=actions)
+
+    # multi runs every action even if an earlier one fails, so a failed
+    # upload only affects the card it belongs to
+    deck_error = None
+    media_errors = [[] for _ in flashcards]
+    for owner, result in zip(owners, results[:setup_count]):
+        if not result.get("error"):
+            if owner is None:
+                _deck_created.add(config.ANKI_DECK_NAME)
+        elif owner is None:
+            deck_error = result["error"]
+        else:
+            media_errors[owner].append(result["error"])
+
+    outcomes = []
+    for errors, result in zip(media_errors, results[setup_count:]):
+        if result.get("error"):
+            error = f"AnkiConnect error: {result['error']}"
+            if deck_error:
+                error += f" (creating the deck failed: {deck_error})"
+        elif errors:
+            error = f"audio could not be stored: {'; '.join(errors)}"
+        else:
+            error = None
+        outcomes.append((result.get("result"), error))
+    return outcomes
+
+
+async def add_notes(flashcards: list) -> list:
+    """Add several notes and their audio files to Anki.
+
+    Cards are sent in batches of multi requests. Returns a (note_id, error)
+    pair per flashcard. note_id is None if the note was not added, and error
+    is None on full success; a note can be added while its audio failed.
+    """
+    outcomes = []
+    for start in range(0, len(flashcards), _MULTI_BATCH_SIZE):
+        batch = flashcards[start:start + _MULTI_BATCH_SIZE]
+        try:
+            outcomes += await _add_note_batch(batch)
+        except (ConnectionError, RuntimeError, httpx.HTTPError) as e:
+            outcomes += [(None, str(e))] * len(batch)
+    return outcomes
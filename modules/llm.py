@@ -1,10 +1,127 @@
-import json
-import requests
+import os
+import re
+import socket
+from typing import Optional
+import httpx
+import orjson
 import config
 
+# Shared client so calls reuse a kept-alive connection instead of reconnecting
+_CLIENT = httpx.AsyncClient(
+    headers={"Content-Type": "application/json"},
+    # No pool timeout: with --concurrency above the connection limit, queued
+    # requests wait for a free connection instead of failing after 60s
+    timeout=httpx.Timeout(60, pool=None),
+    transport=httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)],
+    ),
+)
 
-def generate_examples(vocab_info: dict) -> dict:
-    """Send vocab info to LM Studio and get example sentence + translation."""
+# A JSON object wrapped in a markdown fence, with or without a "json" tag
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(\{.*\})\s*```\s*$", re.DOTALL)
+
+# The example_sentence value of a partially streamed response, once complete
+_SENTENCE_RE = re.compile(r'"example_sentence"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# Set once the warm-up request has been sent for this process
+_warmed_up = False
+
+# Whether the model accepts response_format, or None until it is known
+_supports_json = None
+
+# config's default model name. LM Studio ignores it and serves whatever model
+# is loaded, so capabilities learned under it can't be kept across runs.
+_PLACEHOLDER_MODEL = "local-model"
+
+
+def _caps_path() -> str:
+    """Return the path of the cached model capability flags."""
+    return os.path.join(config.CACHE_DIR, "lm_caps.json")
+
+
+def _load_json_support() -> Optional[bool]:
+    """Read the cached JSON-mode support flag for the configured model."""
+    if config.LM_STUDIO_MODEL == _PLACEHOLDER_MODEL:
+        return None
+    try:
+        with open(_caps_path(), "rb") as f:
+            return orjson.loads(f.read()).get(config.LM_STUDIO_MODEL)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_json_support(supported: bool) -> None:
+    """Remember whether the configured model supports JSON mode."""
+    global _supports_json
+    _supports_json = supported
+    if config.LM_STUDIO_MODEL == _PLACEHOLDER_MODEL:
+        # Only keep the flag for this process; the next run may load another model
+        return
+    try:
+        with open(_caps_path(), "rb") as f:
+            caps = orjson.loads(f.read())
+    except (OSError, ValueError):
+        caps = {}
+    caps[config.LM_STUDIO_MODEL] = supported
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    with open(_caps_path(), "wb") as f:
+        f.write(orjson.dumps(caps))
+
+
+async def warm_up() -> None:
+    """Send a one-token request so LM Studio loads the model ahead of the first card."""
+    global _warmed_up
+    if _warmed_up:
+        return
+    _warmed_up = True
+
+    payload = {
+        "model": config.LM_STUDIO_MODEL,
+        "messages": [{"role": "user", "content": "hi"}],
+        "max_tokens": 1,
+    }
+    try:
+        await _CLIENT.post(config.LM_STUDIO_URL, content=orjson.dumps(payload))
+    except httpx.HTTPError:
+        # The real request reports connection problems, so ignore them here
+        pass
+
+
+async def _stream_completion(payload: dict, on_example_sentence=None) -> str:
+    """Stream a chat completion from LM Studio and return the full content.
+
+    on_example_sentence is called with the example sentence as soon as it has
+    streamed in, while the remaining fields are still being generated.
+    """
+    content = ""
+    sentence_found = on_example_sentence is None
+    async with _CLIENT.stream("POST", config.LM_STUDIO_URL, content=orjson.dumps(payload)) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            delta = orjson.loads(data)["choices"][0]["delta"].get("content")
+            if not delta:
+                continue
+            content += delta
+            if not sentence_found:
+                m = _SENTENCE_RE.search(content)
+                if m:
+                    sentence_found = True
+                    on_example_sentence(orjson.loads(f'"{m.group(1)}"'))
+    return content
+
+
+async def generate_examples(vocab_info: dict, on_example_sentence=None) -> dict:
+    """Send vocab info to LM Studio and get example sentence + translation.
+
+    If given, on_example_sentence is called with the example sentence before
+    the rest of the response has been generated.
+    """
     word = vocab_info["word"]
     readings = ", ".join(vocab_info["readings"])
     meanings = ", ".join(vocab_info["meanings"])
@@ -29,26 +146,35 @@ def generate_examples(vocab_info: dict) -> dict:
     payload = {
         "model": config.LM_STUDIO_MODEL,
         "messages": messages,
-        "response_format": {"type": "json_object"},
         "temperature": 0.7,
+        "stream": True,
     }
 
+    global _supports_json
+    if _supports_json is None:
+        _supports_json = _load_json_support()
+    if _supports_json is not False:
+        payload["response_format"] = {"type": "json_object"}
+
     try:
-        resp = requests.post(config.LM_STUDIO_URL, json=payload, timeout=60)
-        # Fall back without response_format if the model doesn't support it
-        if resp.status_code == 400:
+        try:
+            content = await _stream_completion(payload, on_example_sentence)
+        except httpx.HTTPStatusError as e:
+            # Fall back without response_format if the model doesn't support it
+            if e.response.status_code != 400 or "response_format" not in payload:
+                raise
             payload.pop("response_format")
-            resp = requests.post(config.LM_STUDIO_URL, json=payload, timeout=60)
-        resp.raise_for_status()
-    except requests.ConnectionError:
+            content = await _stream_completion(payload, on_example_sentence)
+            _save_json_support(False)
+        else:
+            if _supports_json is None:
+                _save_json_support(True)
+    except httpx.ConnectError:
         raise ConnectionError(
             f"Cannot connect to LM Studio at {config.LM_STUDIO_URL}. "
             "Is LM Studio running with a model loaded?"
         )
 
-    content = resp.json()["choices"][0]["message"]["content"]
     # Extract JSON from the response, handling markdown fences
-    content = content.strip()
-    if content.startswith("```"):
-        content = content.split("\n", 1)[1].rsplit("```", 1)[0].strip()
-    return json.loads(content)
+    m = _FENCE_RE.match(content)
+    return orjson.loads(m.group(1) if m else content.strip())
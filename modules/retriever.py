@@ -1,26 +1,77 @@
-from jamdict import Jamdict
+import functools
+import os
+import pickle
+import sqlite3
+from contextlib import closing
+import config
 
-jmd = Jamdict()
+_jmd = None
 
 
+def _open_cache() -> sqlite3.Connection:
+    """Open the on-disk lookup cache, creating it if needed."""
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    # SQLite locks the file, so concurrent runs can share the cache safely
+    conn = sqlite3.connect(os.path.join(config.CACHE_DIR, "lookup.sqlite3"), timeout=5)
+    conn.execute("CREATE TABLE IF NOT EXISTS lookup (word TEXT PRIMARY KEY, info BLOB)")
+    return conn
+
+
+@functools.lru_cache(maxsize=4096)
 def lookup(word: str) -> dict:
+    """Look up a Japanese word, using the on-disk cache when possible.
+
+    The cache is best-effort: if it can't be opened, read or written, the word
+    is looked up in the dictionary directly.
+    """
+    try:
+        conn = _open_cache()
+    except (OSError, sqlite3.Error):
+        return _lookup_jamdict(word)
+
+    with closing(conn):
+        try:
+            row = conn.execute("SELECT info FROM lookup WHERE word = ?", (word,)).fetchone()
+            if row:
+                return pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError):
+            pass
+
+        vocab_info = _lookup_jamdict(word)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO lookup (word, info) VALUES (?, ?)",
+                    (word, pickle.dumps(vocab_info)),
+                )
+        except sqlite3.Error:
+            # A failed cache write must not discard a successful lookup
+            pass
+    return vocab_info
+
+
+def _lookup_jamdict(word: str) -> dict:
     """Look up a Japanese word using jamdict (JMdict + KANJIDIC2)."""
-    result = jmd.lookup(word)
+    global _jmd
+    # Only import jamdict and open its database once a lookup misses the cache
+    if _jmd is None:
+        from jamdict import Jamdict
+        _jmd = Jamdict()
+    result = _jmd.lookup(word)
 
     if not result.entries and not result.chars:
         raise ValueError(f"No results found for '{word}'")
 
-    readings = []
-    meanings = []
+    # Dict keys de-duplicate in O(1) while keeping first-seen order
+    readings = {}
+    meanings = {}
 
     for entry in result.entries:
         for kana in entry.kana_forms:
-            if str(kana) not in readings:
-                readings.append(str(kana))
+            readings[str(kana)] = None
         for sense in entry.senses:
             for gloss in sense.gloss:
-                if str(gloss) not in meanings:
-                    meanings.append(str(gloss))
+                meanings[str(gloss)] = None
 
     kanji_info = None
     # Check if the word is a single kanji or extract kanji info from chars
@@ -34,7 +85,7 @@ def lookup(word: str) -> dict:
 
     return {
         "word": word,
-        "readings": readings,
-        "meanings": meanings,
+        "readings": list(readings),
+        "meanings": list(meanings),
         "kanji_info": kanji_info,
     }
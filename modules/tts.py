@@ -1,7 +1,8 @@
 import asyncio
+import hashlib
 import os
 import sys
-import edge_tts
+import tempfile
 import config
 
 VOICE = "ja-JP-NanamiNeural"
@@ -10,15 +11,68 @@ VOICE = "ja-JP-NanamiNeural"
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
+# Event loop reused by the synchronous generate_audio wrapper
+_loop = None
 
-async def _generate(text: str, filepath: str) -> None:
-    communicate = edge_tts.Communicate(text, VOICE)
-    await communicate.save(filepath)
+
+def _cache_path(text: str) -> str:
+    """Return the cache location for audio of the given text and voice."""
+    key = hashlib.blake2b(f"{VOICE}|{text}".encode(), digest_size=16).hexdigest()
+    return os.path.join(config.AUDIO_CACHE_DIR, key + ".mp3")
+
+
+def _read_file(path: str) -> bytes:
+    """Read a cached audio file."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_cache(cache_path: str, data: bytes) -> None:
+    """Store audio in the cache."""
+    os.makedirs(config.AUDIO_CACHE_DIR, exist_ok=True)
+    # Write to a temporary file first so a failed write never leaves a
+    # truncated file in the cache
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=config.AUDIO_CACHE_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+async def generate_audio_async(text: str) -> bytes:
+    """Generate Japanese TTS audio and return the MP3 bytes."""
+    loop = asyncio.get_running_loop()
+    cache_path = _cache_path(text) if config.AUDIO_CACHE_DIR else None
+    if cache_path and os.path.exists(cache_path):
+        return await loop.run_in_executor(None, _read_file, cache_path)
+
+    import edge_tts  # imported here so cache hits never load it
+    audio = bytearray()
+    async for chunk in edge_tts.Communicate(text, VOICE).stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    data = bytes(audio)
+
+    if cache_path:
+        await loop.run_in_executor(None, _write_cache, cache_path, data)
+    return data
 
 
 def generate_audio(text: str, filename: str) -> str:
-    """Generate a Japanese TTS audio file and return its path."""
+    """Generate a Japanese TTS audio file and return its path.
+
+    Synchronous wrapper around generate_audio_async for non-async callers.
+    """
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    data = _loop.run_until_complete(generate_audio_async(text))
+
     os.makedirs(config.AUDIO_DIR, exist_ok=True)
     filepath = os.path.join(config.AUDIO_DIR, filename)
-    asyncio.run(_generate(text, filepath))
+    with open(filepath, "wb") as f:
+        f.write(data)
     return filepath